@@ -7,12 +7,35 @@ Support for iOS and Android apps with natural language instructions.
 
 __version__ = '0.0.3'
 
-# Import main components
-from .agent.prompts import SystemPrompt
-from .agent.service import Agent
-from .agent.views import ActionModel, ActionResult
-from .app.app import App
-from .controller.service import Controller
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+	from .agent.prompts import SystemPrompt
+	from .agent.service import Agent
+	from .agent.views import ActionModel, ActionResult
+	from .app.app import App
+	from .controller.service import Controller
+
+# Main components are imported lazily on first attribute access so that
+# `import app_use` (e.g. for the CLI) does not pull in LangChain, Appium, etc.
+_LAZY_IMPORTS = {
+	'App': '.app.app',
+	'Agent': '.agent.service',
+	'Controller': '.controller.service',
+	'ActionResult': '.agent.views',
+	'ActionModel': '.agent.views',
+	'SystemPrompt': '.agent.prompts',
+}
+
+
+def __getattr__(name: str):
+	if name in _LAZY_IMPORTS:
+		value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+		globals()[name] = value
+		return value
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
 
 # Export main components
 __all__ = ['App', 'Agent', 'Controller', 'ActionResult', 'ActionModel', 'SystemPrompt']
@@ -1,14 +1,41 @@
-from app_use.agent.service import Agent
-from app_use.agent.views import (
-	ActionResult,
-	AgentBrain,
-	AgentError,
-	AgentHistory,
-	AgentHistoryList,
-	AgentOutput,
-	AgentSettings,
-	AgentState,
-)
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+	from app_use.agent.service import Agent
+	from app_use.agent.views import (
+		ActionResult,
+		AgentBrain,
+		AgentError,
+		AgentHistory,
+		AgentHistoryList,
+		AgentOutput,
+		AgentSettings,
+		AgentState,
+	)
+
+# Resolved on first access so importing a submodule (e.g. `app_use.agent.prompts`
+# to render prompt text) does not pull in the agent service and its LLM stack.
+_LAZY_IMPORTS = {
+	'Agent': 'app_use.agent.service',
+	'AgentSettings': 'app_use.agent.views',
+	'AgentState': 'app_use.agent.views',
+	'AgentOutput': 'app_use.agent.views',
+	'AgentHistory': 'app_use.agent.views',
+	'AgentHistoryList': 'app_use.agent.views',
+	'ActionResult': 'app_use.agent.views',
+	'AgentBrain': 'app_use.agent.views',
+	'AgentError': 'app_use.agent.views',
+}
+
+
+def __getattr__(name: str):
+	if name in _LAZY_IMPORTS:
+		value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+		globals()[name] = value
+		return value
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
 
 __all__ = [
 	'Agent',
@@ -427,14 +427,20 @@ Step goal: {model_output.current_state.next_goal}
 
 			return value
 
+		# Build filtered content instead of mutating in place - prompt messages
+		# (e.g. the system message) may be shared between agents.
 		if isinstance(message.content, str):
-			message.content = replace_sensitive(message.content)
+			content = replace_sensitive(message.content)
 		elif isinstance(message.content, list):
-			for i, item in enumerate(message.content):
-				if isinstance(item, dict) and 'text' in item:
-					item['text'] = replace_sensitive(item['text'])
-					message.content[i] = item
-		return message
+			content = [
+				{**item, 'text': replace_sensitive(item['text'])} if isinstance(item, dict) and 'text' in item else item
+				for item in message.content
+			]
+		else:
+			return message
+		if content == message.content:
+			return message
+		return message.model_copy(update={'content': content})
 
 	def _count_tokens(self, message: BaseMessage) -> int:
 		"""Count tokens in a message using a rough estimate"""
@@ -14,6 +14,8 @@ from langchain_core.messages import (
 	ToolMessage,
 )
 
+from app_use.utils import json_loads
+
 logger = logging.getLogger(__name__)
 
 # List of model patterns known to not support tool/function calling
@@ -31,6 +33,7 @@ def is_model_without_tool_support(model_name: str) -> bool:
 
 def extract_json_from_model_output(content: str) -> dict:
 	"""Extract JSON from model output, handling both plain JSON and code-block-wrapped JSON."""
+	original_content = content
 	try:
 		# If content is wrapped in code blocks, extract just the JSON part
 		if '```' in content:
@@ -40,7 +43,14 @@ def extract_json_from_model_output(content: str) -> dict:
 			if '\n' in content:
 				content = content.split('\n', 1)[1]
 		# Parse the cleaned content
-		result_dict = json.loads(content)
+		try:
+			result_dict = json_loads(content)
+		except json.JSONDecodeError:
+			# Fall back to the first balanced {...} object, e.g. when the JSON is surrounded by prose
+			scanner = JsonObjectScanner()
+			if not scanner.feed(original_content):
+				raise
+			result_dict = json_loads(original_content[scanner.start : scanner.end])
 
 		# Some models occasionally respond with a list containing one dict
 		if isinstance(result_dict, list) and len(result_dict) == 1 and isinstance(result_dict[0], dict):
@@ -53,6 +63,111 @@ def extract_json_from_model_output(content: str) -> dict:
 		raise ValueError('Could not parse response.')
 
 
+class JsonObjectScanner:
+	"""Incrementally tracks brace depth to tell when the first top-level JSON object has closed.
+
+	Text inside a leading <think>...</think> block is ignored, and braces inside JSON strings
+	are not counted. Once complete, ``start`` and ``end`` give the object's slice of all text fed.
+
+	With ``strict_start``, scanning only happens when the text opens with ``{``, a code fence or
+	``<think>``, and when the text after a ``</think>`` opens with ``{`` or a code fence. Any other
+	opening (e.g. reasoning that only ends with a stray ``</think>``, or prose before the answer)
+	may contain braces of its own, so the scanner never reports completion for it.
+
+	Each chunk is examined once, so feeding a long reasoning block stays linear in its length.
+	"""
+
+	_THINK_OPEN = '<think>'
+	_THINK_CLOSE = '</think>'
+	_JSON_OPENINGS = ('{', '```')
+
+	def __init__(self, strict_start: bool = False) -> None:
+		self.start = -1
+		self.end = -1
+		self._strict_start = strict_start
+		# 'opening' -> ('think' ->) 'scan' -> 'done', or 'off' when strict and not JSON
+		self._mode = 'opening'
+		self._after_think = False
+		# Absolute offset of the first character not yet consumed (the start of _buffer)
+		self._consumed = 0
+		# Undecided opening text, or the tail of a think block that may hold a partial '</think>'
+		self._buffer = ''
+		self._depth = 0
+		self._in_string = False
+		self._escaped = False
+		self._started = False
+
+	def feed(self, text: str) -> bool:
+		"""Consume the next chunk of text; returns True once the first JSON object is complete."""
+		while True:
+			if self._mode == 'scan':
+				return self._scan(text)
+			if self._mode == 'done':
+				return True
+			if self._mode == 'off':
+				return False
+
+			window = self._buffer + text
+			self._buffer = ''
+
+			if self._mode == 'think':
+				index = window.find(self._THINK_CLOSE)
+				if index == -1:
+					# Keep only as much as could be the start of a '</think>' split across chunks
+					self._buffer = window[-(len(self._THINK_CLOSE) - 1) :]
+					self._consumed += len(window) - len(self._buffer)
+					return False
+				self._consumed += index + len(self._THINK_CLOSE)
+				text = window[index + len(self._THINK_CLOSE) :]
+				self._mode = 'opening'
+				self._after_think = True
+				continue
+
+			# 'opening': decide once how the (remaining) output starts
+			stripped = window.lstrip()
+			self._consumed += len(window) - len(stripped)
+			if not stripped:
+				return False
+			openings = self._JSON_OPENINGS if self._after_think else (*self._JSON_OPENINGS, self._THINK_OPEN)
+			if any(len(stripped) < len(opening) and opening.startswith(stripped) for opening in openings):
+				# Wait until enough text has arrived to tell how the output opens
+				self._buffer = stripped
+				return False
+			if not self._after_think and stripped.startswith(self._THINK_OPEN):
+				self._mode = 'think'
+			elif self._strict_start and not stripped.startswith(self._JSON_OPENINGS):
+				self._mode = 'off'
+			else:
+				self._mode = 'scan'
+			text = stripped
+
+	def _scan(self, text: str) -> bool:
+		"""Track brace depth over *text*, which starts at offset ``_consumed``."""
+		for i, char in enumerate(text):
+			if self._in_string:
+				if self._escaped:
+					self._escaped = False
+				elif char == '\\':
+					self._escaped = True
+				elif char == '"':
+					self._in_string = False
+			elif char == '"':
+				self._in_string = self._started
+			elif char == '{':
+				if not self._started:
+					self.start = self._consumed + i
+					self._started = True
+				self._depth += 1
+			elif char == '}' and self._started:
+				self._depth -= 1
+				if self._depth == 0:
+					self.end = self._consumed + i + 1
+					self._mode = 'done'
+					return True
+		self._consumed += len(text)
+		return False
+
+
 def convert_input_messages(input_messages: list[BaseMessage], model_name: str | None) -> list[BaseMessage]:
 	"""Convert input messages to a format that is compatible with the model"""
 	if model_name is None:
@@ -2,17 +2,145 @@
 
 from __future__ import annotations
 
-import importlib.resources
+import functools
+import hashlib
+import string
+import threading
+import time
 from datetime import datetime
-from typing import TYPE_CHECKING, Optional
-
-from langchain_core.messages import HumanMessage, SystemMessage
+from typing import TYPE_CHECKING, Optional, TypeVar
 
 if TYPE_CHECKING:  # pragma: no cover
 	# These are only for type-checking / IDE auto-completion – avoid cyclic deps
+	from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
 	from app_use.agent.views import AgentStepInfo
 	from app_use.nodes.app_node import AppState
 
+_M = TypeVar('_M', bound='BaseMessage')
+
+
+# (timestamp, formatted) of the last rendered "current date and time" string
+_last_ts_cache: tuple[float, str] = (0.0, '')
+
+
+def _current_time_str() -> str:
+	"""Return the current local time as 'YYYY-MM-DD HH:MM', recomputed at most every 20 seconds."""
+	global _last_ts_cache
+	now = time.time()
+	if now - _last_ts_cache[0] < 20:
+		return _last_ts_cache[1]
+	dt = datetime.fromtimestamp(now)
+	time_str = f'{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}'
+	_last_ts_cache = (now, time_str)
+	return time_str
+
+
+def _screenshot_url(app_state: AppState) -> str:
+	"""Return the screenshot of *app_state* as a data URL, built once per snapshot."""
+	state_dict = vars(app_state)
+	url = state_dict.get('_cached_data_url')
+	if url is None:
+		screenshot = app_state.screenshot
+		url = screenshot if screenshot.startswith('data:') else 'data:image/png;base64,' + screenshot
+		state_dict['_cached_data_url'] = url
+	return url
+
+
+def _cached_text_block(text: str) -> dict:
+	"""Return a text content block marked for provider-side prompt caching (Anthropic)."""
+	return {'type': 'text', 'text': text, 'cache_control': {'type': 'ephemeral'}}
+
+
+@functools.lru_cache(maxsize=64)
+def _render_system(
+	action_description: str,
+	max_actions: int,
+	override_system_message: str | None,
+) -> str:
+	"""Render the persistent part of the system prompt, cached per distinct set of inputs."""
+	if override_system_message is not None:
+		# User supplied text is not a format template – only substitute the action list.
+		return override_system_message.replace('{actions}', action_description)
+	# Fill *max_actions* and *actions* into the template in a single pass.
+	return SystemPrompt._load_prompt_template().format_map({'max_actions': max_actions, 'actions': action_description})
+
+
+# Static instructions and the (session-stable) action list come first so that
+# providers with automatic prefix caching can reuse them; the per-step fields
+# are rendered separately and appended at the end.
+_PLANNER_BODY_TEMPLATE = string.Template(
+	"""
+You are a planning agent that helps break down tasks into smaller steps when interacting with **mobile** apps.
+
+Your role is to:
+1. Analyse the current state and history
+2. Evaluate progress towards the ultimate goal
+3. Identify potential challenges or roadblocks
+4. Suggest the next high-level steps to take
+
+Available actions for the main agent:
+$available_actions
+
+Respond strictly as a JSON object with the following fields:
+{
+    "state_analysis": "Brief analysis of the current state and what has been done so far",
+    "progress_evaluation": "Evaluation of progress towards the ultimate goal (percentage + short description)",
+    "challenges": "List any potential challenges or roadblocks",
+    "next_steps": "List 2-3 concrete next steps to take",
+    "reasoning": "Explain your reasoning for the suggested next steps"
+}
+
+"""
+)
+
+
+@functools.lru_cache(maxsize=16)
+def _render_planner_prefix(available_actions: str) -> str:
+	"""Render the static part of the planner prompt, cached per action list."""
+	return _PLANNER_BODY_TEMPLATE.substitute(available_actions=available_actions)
+
+
+def _render_planner_suffix(original_task: str, current_step: int, extend_prompt: str | None) -> str:
+	"""Render the per-step part of the planner prompt (task, step number, extension)."""
+	suffix = f'<task>{original_task}</task>\n<step>{current_step}</step>\n'
+	if extend_prompt:
+		suffix += f'\n{extend_prompt}'
+	return suffix
+
+
+# Recently built prompt messages, keyed by message class + content (FIFO, bounded).
+# Building a LangChain message runs pydantic validation, so identical prompts
+# across steps / agents reuse one instance. Shared instances must not be mutated.
+# The cache is process-wide; the lock keeps it consistent when agents are
+# constructed from several threads.
+_MESSAGE_CACHE_SIZE = 32
+_message_cache: dict[tuple, BaseMessage] = {}
+_message_cache_lock = threading.Lock()
+
+
+def _interned_message(
+	message_cls: type[_M],
+	content: str | list[dict],
+	additional_kwargs: dict[str, str] | None = None,
+) -> _M:
+	"""Return a cached *message_cls* instance for *content*, creating it on first use."""
+	if isinstance(content, str):
+		content_key = content
+	else:
+		content_key = tuple((block.get('text'), 'cache_control' in block) for block in content)
+	key = (message_cls, content_key, tuple(sorted(additional_kwargs.items())) if additional_kwargs else ())
+
+	with _message_cache_lock:
+		message = _message_cache.get(key)
+		if message is None:
+			message = message_cls(content=content, additional_kwargs=additional_kwargs or {})
+			if len(_message_cache) >= _MESSAGE_CACHE_SIZE:
+				# Evict the oldest entry (dicts preserve insertion order).
+				del _message_cache[next(iter(_message_cache))]
+			_message_cache[key] = message
+	return message  # type: ignore[return-value]
+
 
 class SystemPrompt:
 	"""Generate the system prompt used for the LLM conversation.
@@ -41,42 +169,68 @@ class SystemPrompt:
 		max_actions_per_step: int = 10,
 		override_system_message: str | None = None,
 		extend_system_message: str | None = None,
+		provider_supports_cache_control: bool = False,
 	) -> None:
 		self.default_action_description = action_description
 		self.max_actions_per_step = max_actions_per_step
+		self.provider_supports_cache_control = provider_supports_cache_control
 
-		# Decide final prompt content.
-		if override_system_message is not None:
-			prompt_text = override_system_message
-		else:
-			prompt_text = self._load_prompt_template().format(max_actions=max_actions_per_step)
-		# Append dynamic section with actions.
-		prompt_text = prompt_text.replace('{actions}', action_description)
-
-		if extend_system_message:
-			prompt_text += f'\n{extend_system_message}'
+		# Persistent part (template + actions) vs. per-run extension, so the
+		# former stays a cacheable prefix even when the extension changes.
+		self._static_text = _render_system(action_description, max_actions_per_step, override_system_message)
+		self._dynamic_text = extend_system_message or ''
+		self.prompt_text = f'{self._static_text}\n{self._dynamic_text}' if self._dynamic_text else self._static_text
 
-		self.system_message = SystemMessage(content=prompt_text)
+		# Deterministic identifier of the rendered prompt. Callers can use it to
+		# key provider-native prompt caches (e.g. prebuilt prefill cache files)
+		# across processes.
+		self.prompt_hash = hashlib.blake2b(self.prompt_text.encode('utf-8'), digest_size=16).hexdigest()
 
 	# ---------------------------------------------------------------------
 	# Helpers
 	# ---------------------------------------------------------------------
 
-	def _load_prompt_template(self) -> str:
-		"""Load the markdown template from package resources or fallback."""
+	@classmethod
+	@functools.lru_cache(maxsize=1)
+	def _load_prompt_template(cls) -> str:
+		"""Load the markdown template from package resources or fallback.
+
+		The template is static, so it is read once per process and cached.
+		"""
+		import importlib.resources
+
 		try:
-			with importlib.resources.files('app_use.agent').joinpath('system_prompt.md').open('r', encoding='utf-8') as f:
-				return f.read()
+			return importlib.resources.files('app_use.agent').joinpath('system_prompt.md').read_text(encoding='utf-8')
 		except (FileNotFoundError, ModuleNotFoundError):
 			# Development / editable install – fall back to built-in template.
-			return self.DEFAULT_TEMPLATE
+			return cls.DEFAULT_TEMPLATE
 
 	# ------------------------------------------------------------------
 	# API
 	# ------------------------------------------------------------------
 	def get_system_message(self) -> SystemMessage:
-		"""Return the ready-to-use *SystemMessage* instance."""
-		return self.system_message
+		"""Return the ready-to-use *SystemMessage* instance.
+
+		The message object is only built here, so callers that just need
+		`prompt_text` / `prompt_hash` never import LangChain.
+		"""
+		from langchain_core.messages import SystemMessage
+
+		content: str | list[dict]
+		if self.provider_supports_cache_control:
+			# Only the persistent block is marked for provider-side prompt caching.
+			content = [_cached_text_block(self._static_text)]
+			if self._dynamic_text:
+				content.append({'type': 'text', 'text': self._dynamic_text})
+		else:
+			content = self.prompt_text
+
+		return _interned_message(SystemMessage, content, {'cache_key': self.prompt_hash})
+
+	@property
+	def system_message(self) -> SystemMessage:
+		"""Backwards-compatible alias for `get_system_message()`."""
+		return self.get_system_message()
 
 
 class PlannerPrompt(SystemPrompt):
@@ -89,12 +243,14 @@ class PlannerPrompt(SystemPrompt):
 		current_step: int = 1,
 		is_reasoning: bool = False,
 		extend_prompt: str | None = None,
+		provider_supports_cache_control: bool = False,
 	):
 		self.available_actions = available_actions
 		self.original_task = original_task
 		self.current_step = current_step
 		self.is_reasoning = is_reasoning
 		self.extend_prompt = extend_prompt
+		self.provider_supports_cache_control = provider_supports_cache_control
 
 	def get_system_message(
 		self,
@@ -103,6 +259,7 @@ class PlannerPrompt(SystemPrompt):
 		extended_planner_system_prompt: str | None = None,
 	) -> SystemMessage | HumanMessage:
 		"""Return either a *SystemMessage* or *HumanMessage* depending on COT needs."""
+		from langchain_core.messages import HumanMessage, SystemMessage
 
 		# Use instance variables if method parameters are not provided
 		if is_planner_reasoning is None:
@@ -110,39 +267,29 @@ class PlannerPrompt(SystemPrompt):
 		if extended_planner_system_prompt is None:
 			extended_planner_system_prompt = self.extend_prompt
 
-		planner_prompt_text = f"""
-You are a planning agent that helps break down tasks into smaller steps when interacting with **mobile** apps.
-
-Original task: {self.original_task}
-Current step: {self.current_step}
+		static_text = _render_planner_prefix(self.available_actions)
+		dynamic_text = _render_planner_suffix(self.original_task, self.current_step, extended_planner_system_prompt)
 
-Your role is to:
-1. Analyse the current state and history
-2. Evaluate progress towards the ultimate goal
-3. Identify potential challenges or roadblocks
-4. Suggest the next high-level steps to take
-
-Available actions for the main agent:
-{self.available_actions}
-
-Respond strictly as a JSON object with the following fields:
-{{
-    "state_analysis": "Brief analysis of the current state and what has been done so far",
-    "progress_evaluation": "Evaluation of progress towards the ultimate goal (percentage + short description)",
-    "challenges": "List any potential challenges or roadblocks",
-    "next_steps": "List 2-3 concrete next steps to take",
-    "reasoning": "Explain your reasoning for the suggested next steps"
-}}
-"""
-		if extended_planner_system_prompt:
-			planner_prompt_text += f'\n{extended_planner_system_prompt}'
+		content: str | list
+		if self.provider_supports_cache_control:
+			# Everything before the task is static – cache it and send the rest as a plain block.
+			content = [_cached_text_block(static_text), {'type': 'text', 'text': dynamic_text}]
+		else:
+			content = static_text + dynamic_text
 
+		# The step number changes on every call, so these messages are not interned:
+		# they would only push the reusable system prompts out of the message cache.
 		if is_planner_reasoning:
 			# For chain-of-thought we provide the text as a *HumanMessage* so the
 			# model reveals its reasoning but we do NOT expose that to the final
 			# user.
-			return HumanMessage(content=planner_prompt_text)
-		return SystemMessage(content=planner_prompt_text)
+			return HumanMessage(content=content)
+		return SystemMessage(content=content)
+
+
+# Viewport boundary markers used when there is nothing left to scroll
+_START_OF_PAGE = '[Start of page]\n'
+_END_OF_PAGE = '\n[End of page]'
 
 
 # -------------------------------------------------------------------------
@@ -167,8 +314,9 @@ class AgentMessagePrompt:
 		sensitive_data: str | None = None,
 	) -> None:
 		self.app_state = app_state
-		self.agent_history_description = agent_history_description
-		self.read_state_description = read_state_description
+		# Normalised once here so rendering can splice them in verbatim
+		self.agent_history_description = agent_history_description.strip('\n') if agent_history_description else ''
+		self.read_state_description = read_state_description.strip('\n') if read_state_description else ''
 		self.task = task
 		self.include_attributes = include_attributes or []
 		self.step_info = step_info
@@ -178,31 +326,42 @@ class AgentMessagePrompt:
 	# Public helpers
 	# ------------------------------------------------------------------
 	def _get_app_state_description(self) -> str:
-		"""Get description of the current app state"""
+		"""Get description of the current app state
+
+		The element tree walk is cached on the *app_state* snapshot itself so
+		that every prompt built from the same snapshot (vision / non-vision,
+		planner, history re-renders) shares a single rendering per attribute set.
+		"""
+		snapshot_cache: dict[tuple[str, ...], str] = vars(self.app_state).setdefault('_prompt_description_cache', {})
+		cache_key = tuple(self.include_attributes)
+		description = snapshot_cache.get(cache_key)
+		if description is None:
+			description = self._build_app_state_description()
+			snapshot_cache[cache_key] = description
+		return description
+
+	def _build_app_state_description(self) -> str:
+		"""Render the interactive elements of *app_state* with scroll context"""
 		# List interactive elements in the current viewport
 		elements_text = self.app_state.element_tree.interactive_elements_to_string(include_attributes=self.include_attributes)
 
-		has_content_above = (self.app_state.pixels_above or 0) > 0
-		has_content_below = (self.app_state.pixels_below or 0) > 0
+		above = self.app_state.pixels_above or 0
+		below = self.app_state.pixels_below or 0
 
 		if elements_text:
-			if has_content_above:
-				elements_text = (
-					f'... {self.app_state.pixels_above} pixels above - scroll or extract content to see more ...\n{elements_text}'
-				)
+			if above > 0:
+				elements_text = f'... {above} pixels above - scroll or extract content to see more ...\n{elements_text}'
 			else:
-				elements_text = f'[Start of page]\n{elements_text}'
+				elements_text = _START_OF_PAGE + elements_text
 
-			if has_content_below:
-				elements_text = (
-					f'{elements_text}\n... {self.app_state.pixels_below} pixels below - scroll or extract content to see more ...'
-				)
+			if below > 0:
+				elements_text = f'{elements_text}\n... {below} pixels below - scroll or extract content to see more ...'
 			else:
-				elements_text = f'{elements_text}\n[End of page]'
+				elements_text += _END_OF_PAGE
 		else:
 			elements_text = 'empty page'
 
-		return f'Interactive elements from top layer of the current page inside the viewport:\n{elements_text}'
+		return f'Interactive elements from top layer of the current page inside the viewport:\n{elements_text}'.strip('\n')
 
 	def _get_agent_state_description(self) -> str:
 		"""Get description of current agent state and context"""
@@ -211,8 +370,7 @@ class AgentMessagePrompt:
 		else:
 			step_info_description = ''
 
-		time_str = datetime.now().strftime('%Y-%m-%d %H:%M')
-		step_info_description += f'Current date and time: {time_str}'
+		step_info_description += f'Current date and time: {_current_time_str()}'
 
 		agent_state = f"""
 <user_request>
@@ -229,18 +387,20 @@ class AgentMessagePrompt:
 
 	def get_user_message(self, use_vision: bool = True) -> HumanMessage:
 		"""Return a `HumanMessage` describing *app_state* with viewport context."""
-
-		state_description = (
-			'<agent_history>\n'
-			+ (self.agent_history_description.strip('\n') if self.agent_history_description else '')
-			+ '\n</agent_history>\n'
-		)
-		state_description += '<agent_state>\n' + self._get_agent_state_description().strip('\n') + '\n</agent_state>\n'
-		state_description += '<app_state>\n' + self._get_app_state_description().strip('\n') + '\n</app_state>\n'
-		state_description += (
-			'<read_state>\n'
-			+ (self.read_state_description.strip('\n') if self.read_state_description else '')
-			+ '\n</read_state>\n'
+		from langchain_core.messages import HumanMessage
+
+		state_description = ''.join(
+			[
+				'<agent_history>\n',
+				self.agent_history_description,
+				'\n</agent_history>\n<agent_state>\n',
+				self._get_agent_state_description(),
+				'\n</agent_state>\n<app_state>\n',
+				self._get_app_state_description(),
+				'\n</app_state>\n<read_state>\n',
+				self.read_state_description,
+				'\n</read_state>\n',
+			]
 		)
 
 		# Multi-modal message (text + screenshot) for vision models
@@ -250,7 +410,7 @@ class AgentMessagePrompt:
 					{'type': 'text', 'text': state_description},
 					{
 						'type': 'image_url',
-						'image_url': {'url': f'data:image/png;base64,{self.app_state.screenshot}'},
+						'image_url': {'url': _screenshot_url(self.app_state)},
 					},
 				]
 			)
@@ -8,8 +8,9 @@ import shutil
 import time
 import uuid
 from collections.abc import Awaitable, Callable
-from threading import Thread
-from typing import Any, Generic, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, ClassVar, Generic, TypeVar
 
 from dotenv import load_dotenv
 from langchain_core.language_models.chat_models import BaseChatModel
@@ -25,6 +26,7 @@ from app_use.agent.memory.service import Memory
 from app_use.agent.memory.views import MemoryConfig
 from app_use.agent.message_manager.service import MessageManager, MessageManagerSettings
 from app_use.agent.message_manager.utils import (
+	JsonObjectScanner,
 	convert_input_messages,
 	extract_json_from_model_output,
 	is_model_without_tool_support,
@@ -32,7 +34,9 @@ from app_use.agent.message_manager.utils import (
 )
 from app_use.agent.prompts import PlannerPrompt, SystemPrompt
 from app_use.agent.views import (
+	CACHE_CONTROL_LLM_LIBRARIES,
 	REQUIRED_LLM_API_ENV_VARS,
+	ActionModel,
 	ActionResult,
 	AgentError,
 	AgentHistory,
@@ -47,16 +51,127 @@ from app_use.agent.views import (
 )
 from app_use.app.app import App
 from app_use.controller.service import Controller
-from app_use.utils import LLMException, handle_llm_error, time_execution_async
+from app_use.nodes.app_node import AppState
+from app_use.utils import LLMException, handle_llm_error, json_loads, time_execution_async
+
+try:
+	import fcntl
+except ImportError:  # Windows
+	fcntl = None
+
+try:
+	from openai import RateLimitError
+except ImportError:
+	RateLimitError = None
+
+# Provider errors that are retried after `retry_delay` rather than logged as failures
+RATE_LIMIT_ERRORS: tuple[type[Exception], ...] = tuple(
+	error_cls
+	for error_cls in (
+		RateLimitError,  # OpenAI
+		# Add other rate limit errors as needed
+	)
+	if error_cls is not None
+)
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 SKIP_LLM_API_KEY_VERIFICATION = os.environ.get('SKIP_LLM_API_KEY_VERIFICATION', 'false').lower()[0] in 'ty1'
+PERSIST_TOOL_METHOD_CACHE = os.environ.get('APP_USE_PERSIST_TOOL_METHOD_CACHE', 'false').lower()[0] in 'ty1'
+
+# Verified tool calling methods shared by every agent in the process, keyed by
+# (chat model library, model name). With APP_USE_PERSIST_TOOL_METHOD_CACHE set,
+# entries are also stored on disk so later processes skip the probe as well.
+_TOOL_METHOD_CACHE: dict[tuple[str, str], str] = {}
+_TOOL_METHOD_CACHE_FILE = Path.home() / '.cache' / 'app_use' / 'tool_methods.json'
+_tool_method_cache_loaded = False
+
+# Known tool calling methods per chat model library: (model name substrings, method)
+# pairs checked in order. A library listed here with no match needs testing.
+_KNOWN_TOOL_CALLING_METHODS: dict[str, tuple[tuple[tuple[str, ...], str], ...]] = {
+	'ChatOpenAI': ((('gpt-4', 'gpt-3.5', 'llama-4', 'llama-3'), 'function_calling'),),
+	'ChatGroq': ((('llama-4', 'llama-3'), 'function_calling'),),
+	'AzureChatOpenAI': ((('gpt-4-',), 'tools'), (('',), 'function_calling')),
+	'ChatGoogleGenerativeAI': (),  # Google uses native tool support
+	'ChatAnthropic': ((('claude-3', 'claude-2'), 'tools'),),
+	'AnthropicChat': ((('claude-3', 'claude-2'), 'tools'),),
+}
+
+
+def _get_cached_tool_calling_method(library: str, model: str) -> str | None:
+	"""Return the verified tool calling method for *library*/*model*, if any."""
+	global _tool_method_cache_loaded
+	if PERSIST_TOOL_METHOD_CACHE and not _tool_method_cache_loaded:
+		_tool_method_cache_loaded = True
+		try:
+			with open(_TOOL_METHOD_CACHE_FILE, encoding='utf-8') as f:
+				if fcntl is not None:
+					fcntl.flock(f, fcntl.LOCK_SH)
+				stored = json_loads(f.read() or '{}')
+			for key, method in stored.items():
+				stored_library, _, stored_model = key.partition('::')
+				_TOOL_METHOD_CACHE.setdefault((stored_library, stored_model), method)
+		except (OSError, ValueError, AttributeError) as e:
+			logger.debug(f'Could not read tool calling method cache: {e}')
+	return _TOOL_METHOD_CACHE.get((library, model))
+
+
+def _store_tool_calling_method(library: str, model: str, method: str) -> None:
+	"""Remember a verified tool calling method for *library*/*model*."""
+	if _TOOL_METHOD_CACHE.get((library, model)) == method:
+		return
+	_TOOL_METHOD_CACHE[(library, model)] = method
+	if not PERSIST_TOOL_METHOD_CACHE:
+		return
+	try:
+		_TOOL_METHOD_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+		with open(_TOOL_METHOD_CACHE_FILE, 'a+', encoding='utf-8') as f:
+			# Exclusive lock so concurrent processes merge rather than clobber entries
+			if fcntl is not None:
+				fcntl.flock(f, fcntl.LOCK_EX)
+			f.seek(0)
+			try:
+				stored = json_loads(f.read() or '{}')
+			except ValueError:
+				stored = {}
+			stored[f'{library}::{model}'] = method
+			f.seek(0)
+			f.truncate()
+			json.dump(stored, f, indent=2)
+	except OSError as e:
+		logger.debug(f'Could not write tool calling method cache: {e}')
+
+
+# [columns, monotonic time of last lookup]; the terminal size is re-queried at most every 5s
+_TERM_WIDTH_CACHE: list = [0, 0.0]
+
+
+def _terminal_width() -> int:
+	"""Return the terminal width, avoiding a TIOCGWINSZ ioctl on every LLM call."""
+	now = time.monotonic()
+	if not _TERM_WIDTH_CACHE[0] or now - _TERM_WIDTH_CACHE[1] > 5:
+		_TERM_WIDTH_CACHE[0] = shutil.get_terminal_size((80, 20)).columns
+		_TERM_WIDTH_CACHE[1] = now
+	return _TERM_WIDTH_CACHE[0]
+
+
+class _LazyActionJson:
+	"""Defer an action's JSON dump until the log record is actually formatted."""
+
+	__slots__ = ('action',)
+
+	def __init__(self, action: BaseModel) -> None:
+		self.action = action
+
+	def __str__(self) -> str:
+		return self.action.model_dump_json(exclude_unset=True)
 
 
 def log_response(response: AgentOutput) -> None:
 	"""Utility function to log the model's response."""
+	if not logger.isEnabledFor(logging.INFO):
+		return
 
 	if 'Success' in response.evaluation_previous_goal:
 		emoji = '👍'
@@ -65,12 +180,12 @@ def log_response(response: AgentOutput) -> None:
 	else:
 		emoji = '🤷'
 
-	logger.info(f'💡 Thinking:\n{response.thinking}')
-	logger.info(f'{emoji} Eval: {response.evaluation_previous_goal}')
-	logger.info(f'🧠 Memory: {response.memory}')
-	logger.info(f'🎯 Next goal: {response.next_goal}')
+	logger.info('💡 Thinking:\n%s', response.thinking)
+	logger.info('%s Eval: %s', emoji, response.evaluation_previous_goal)
+	logger.info('🧠 Memory: %s', response.memory)
+	logger.info('🎯 Next goal: %s', response.next_goal)
 	for i, action in enumerate(response.action):
-		logger.info(f'🛠️  Action {i + 1}/{len(response.action)}: {action.model_dump_json(exclude_unset=True)}')
+		logger.info('🛠️  Action %d/%d: %s', i + 1, len(response.action), _LazyActionJson(action))
 
 
 Context = TypeVar('Context')
@@ -79,6 +194,10 @@ AgentHookFunc = Callable[['Agent'], Awaitable[None]]
 
 
 class Agent(Generic[Context]):
+	# (LLM class name, model name) pairs whose connection test already passed in this
+	# process, so later agents against the same model skip the blocking round-trip.
+	_verified_llm_connections: ClassVar[set[tuple[str, str]]] = set()
+
 	def __init__(
 		self,
 		task: str,
@@ -113,6 +232,7 @@ class Agent(Generic[Context]):
 		memory_config: MemoryConfig | None = None,
 		generate_gif: bool | str = False,
 		use_mem0_client: bool = False,
+		force_gc_on_close: bool = False,
 	):
 		if page_extraction_llm is None:
 			page_extraction_llm = llm
@@ -148,6 +268,7 @@ class Agent(Generic[Context]):
 			is_planner_reasoning=is_planner_reasoning,
 			extend_planner_system_prompt=extend_planner_system_message,
 			generate_gif=generate_gif,
+			force_gc_on_close=force_gc_on_close,
 		)
 
 		# Memory settings
@@ -156,6 +277,10 @@ class Agent(Generic[Context]):
 
 		# Initialize state
 		self.state = injected_agent_state or AgentState()
+		# Woken by resume() / stop() so a paused run() does not wait out a poll interval.
+		# Those may be called from another thread, so the event is set through run()'s loop.
+		self._resume_event = asyncio.Event()
+		self._run_loop: asyncio.AbstractEventLoop | None = None
 
 		# Action setup
 		self._setup_action_models()
@@ -170,11 +295,24 @@ class Agent(Generic[Context]):
 		# Initialize available actions for system prompt
 		self.unfiltered_actions = self.controller.registry.get_prompt_description()
 
+		# The planner prompt only changes with the step number, so build it once and reuse it
+		self._planner_prompt = (
+			PlannerPrompt(
+				available_actions=self.unfiltered_actions,
+				original_task=self.task,
+				is_reasoning=self.settings.is_planner_reasoning,
+				extend_prompt=self.settings.extend_planner_system_prompt,
+				provider_supports_cache_control=self.settings.planner_llm.__class__.__name__ in CACHE_CONTROL_LLM_LIBRARIES,
+			)
+			if self.settings.planner_llm
+			else None
+		)
+
 		# Set message context and initialize message manager
 		self.settings.message_context = self._set_message_context()
 
 		# Initialize message manager with state
-		system_message = self._get_system_message()
+		system_message = self._get_system_message(self.unfiltered_actions)
 
 		self._message_manager = MessageManager(
 			task=task,
@@ -222,11 +360,6 @@ class Agent(Generic[Context]):
 			f'{" +reasoning" if self.settings.is_planner_reasoning else ""}'
 		)
 
-		self.initial_actions = self._convert_initial_actions(initial_actions) if initial_actions else None
-
-		# Context
-		self.context = context
-
 	def _set_message_context(self) -> str | None:
 		"""Set the message context for the agent."""
 		if self.tool_calling_method == 'raw':
@@ -237,14 +370,14 @@ class Agent(Generic[Context]):
 				self.settings.message_context = f'Available actions: {self.unfiltered_actions}'
 		return self.settings.message_context
 
-	def _get_system_message(self) -> SystemMessage:
+	def _get_system_message(self, action_description: str) -> SystemMessage:
 		"""Generate the system message for the agent using SystemPrompt"""
-		action_description = self.controller.registry.get_prompt_description()
 		system_prompt = SystemPrompt(
 			action_description=action_description,
 			max_actions_per_step=self.settings.max_actions_per_step,
 			override_system_message=self.settings.override_system_message,
 			extend_system_message=self.settings.extend_system_message,
+			provider_supports_cache_control=self.chat_model_library in CACHE_CONTROL_LLM_LIBRARIES,
 		)
 		return system_prompt.get_system_message()
 
@@ -281,6 +414,11 @@ class Agent(Generic[Context]):
 		self.DoneActionModel = self.controller.registry.create_action_model(include_actions=['done'])
 		self.DoneAgentOutput = AgentOutput.type_with_custom_actions(self.DoneActionModel)
 
+		# action name -> param model, used to convert dict-based actions without registry lookups
+		self._action_index: dict[str, type[BaseModel]] = {
+			name: action.param_model for name, action in self.controller.registry.registry.actions.items()
+		}
+
 	def _set_tool_calling_method(self) -> ToolCallingMethod | None:
 		"""Determine the best tool calling method to use with the current LLM."""
 
@@ -288,7 +426,12 @@ class Agent(Generic[Context]):
 		if self.settings.tool_calling_method != 'auto':
 			# Skip test if already verified
 			if getattr(self.llm, '_verified_api_keys', None) is True:
-				setattr(self.llm, '_verified_api_keys', True)
+				self._mark_llm_verified()
+				setattr(self.llm, '_verified_tool_calling_method', self.settings.tool_calling_method)
+				return self.settings.tool_calling_method
+
+			# Skip test if another agent already verified this method for the model
+			if _get_cached_tool_calling_method(self.chat_model_library, self.model_name) == self.settings.tool_calling_method:
 				setattr(self.llm, '_verified_tool_calling_method', self.settings.tool_calling_method)
 				return self.settings.tool_calling_method
 
@@ -301,7 +444,7 @@ class Agent(Generic[Context]):
 						f"Configured tool calling method '{self.settings.tool_calling_method}' "
 						'is not supported by the current LLM.'
 					)
-			setattr(self.llm, '_verified_tool_calling_method', self.settings.tool_calling_method)
+			self._cache_tool_calling_method(self.settings.tool_calling_method)
 			return self.settings.tool_calling_method
 
 		# Check if we already have a cached method on this LLM instance
@@ -311,24 +454,31 @@ class Agent(Generic[Context]):
 			)
 			return getattr(self.llm, '_verified_tool_calling_method')
 
+		# Check if another agent in this process (or a previous run) verified this model
+		cached_method = _get_cached_tool_calling_method(self.chat_model_library, self.model_name)
+		if cached_method is not None:
+			setattr(self.llm, '_verified_tool_calling_method', cached_method)
+			logger.debug(f'🛠️ Using cached tool calling method for {self.chat_model_library}/{self.model_name}: [{cached_method}]')
+			return cached_method  # type: ignore
+
 		# Try fast path for known model/library combinations
 		known_method = self._get_known_tool_calling_method()
 		if known_method is not None:
 			# Trust known combinations without testing if verification is already done or skipped
 			if getattr(self.llm, '_verified_api_keys', None) is True:
-				setattr(self.llm, '_verified_api_keys', True)
+				self._mark_llm_verified()
 				setattr(self.llm, '_verified_tool_calling_method', known_method)  # Cache on LLM instance
 				logger.debug(
 					f'🛠️ Using known tool calling method for {self.chat_model_library}/{self.model_name}: [{known_method}] (skipped test)'
 				)
 				return known_method  # type: ignore
 
-			start_time = time.time()
+			start_time = time.monotonic()
 			# Verify the known method works
 			if self._test_tool_calling_method(known_method):
-				setattr(self.llm, '_verified_api_keys', True)
-				setattr(self.llm, '_verified_tool_calling_method', known_method)  # Cache on LLM instance
-				elapsed = time.time() - start_time
+				self._mark_llm_verified()
+				self._cache_tool_calling_method(known_method)
+				elapsed = time.monotonic() - start_time
 				logger.debug(
 					f'🛠️ Using known tool calling method for {self.chat_model_library}/{self.model_name}: [{known_method}] in {elapsed:.2f}s'
 				)
@@ -343,7 +493,7 @@ class Agent(Generic[Context]):
 
 	def _detect_best_tool_calling_method(self) -> str | None:
 		"""Detect the best supported tool calling method by testing each one."""
-		start_time = time.time()
+		start_time = time.monotonic()
 
 		# Order of preference for tool calling methods
 		methods_to_try = [
@@ -353,54 +503,24 @@ class Agent(Generic[Context]):
 			'raw',  # Fallback - no tool calling support
 		]
 
-		# Try parallel testing for faster detection
+		# Probe all methods concurrently – they are independent network calls, so
+		# detection takes roughly one round-trip instead of one per method.
+		# A plain thread pool works whether or not an event loop is running.
 		try:
-			# Run async parallel tests
-			async def test_all_methods():
-				tasks = [self._test_tool_calling_method_async(method) for method in methods_to_try]
-				results = await asyncio.gather(*tasks, return_exceptions=True)
-				return results
-
-			# Execute async tests
+			probe_pool = ThreadPoolExecutor(max_workers=len(methods_to_try), thread_name_prefix='app_use_tool_probe')
 			try:
-				loop = asyncio.get_running_loop()
-				# Running loop: create a new loop in a separate thread
-				result = {}
-
-				def run_in_thread():
-					new_loop = asyncio.new_event_loop()
-					asyncio.set_event_loop(new_loop)
-					try:
-						result['value'] = new_loop.run_until_complete(test_all_methods())
-					except Exception as e:
-						result['error'] = e
-					finally:
-						new_loop.close()
-
-				t = Thread(target=run_in_thread)
-				t.start()
-				t.join()
-				if 'error' in result:
-					raise result['error']
-				results = result['value']
-
-			except RuntimeError as e:
-				if 'no running event loop' in str(e):
-					results = asyncio.run(test_all_methods())
-				else:
-					raise
-
-			# Process results in order of preference
-			for i, method in enumerate(methods_to_try):
-				if not isinstance(results, list):
-					continue
-				ith_result = results[i]
-				if isinstance(ith_result, tuple) and ith_result[1]:  # (method, success)
-					setattr(self.llm, '_verified_api_keys', True)
-					setattr(self.llm, '_verified_tool_calling_method', method)  # Cache on LLM instance
-					elapsed = time.time() - start_time
-					logger.debug(f'🛠️ Tested LLM in parallel and chose tool calling method: [{method}] in {elapsed:.2f}s')
-					return method
+				futures = [probe_pool.submit(self._test_tool_calling_method, method) for method in methods_to_try]
+				# Take results in order of preference; stop as soon as the best
+				# working method is known instead of waiting for slower probes.
+				for method, future in zip(methods_to_try, futures):
+					if future.result():
+						self._mark_llm_verified()
+						self._cache_tool_calling_method(method)
+						elapsed = time.monotonic() - start_time
+						logger.debug(f'🛠️ Tested LLM in parallel and chose tool calling method: [{method}] in {elapsed:.2f}s')
+						return method
+			finally:
+				probe_pool.shutdown(wait=False, cancel_futures=True)
 
 		except Exception as e:
 			logger.debug(f'Parallel testing failed: {e}, falling back to sequential')
@@ -408,46 +528,34 @@ class Agent(Generic[Context]):
 			for method in methods_to_try:
 				if self._test_tool_calling_method(method):
 					# if we found the method which means api is verified.
-					setattr(self.llm, '_verified_api_keys', True)
-					setattr(self.llm, '_verified_tool_calling_method', method)  # Cache on LLM instance
-					elapsed = time.time() - start_time
+					self._mark_llm_verified()
+					self._cache_tool_calling_method(method)
+					elapsed = time.monotonic() - start_time
 					logger.debug(f'🛠️ Tested LLM and chose tool calling method: [{method}] in {elapsed:.2f}s')
 					return method
 
 		# If we get here, no methods worked
 		raise ConnectionError('Failed to connect to LLM. Please check your API key and network connection.')
 
+	def _mark_llm_verified(self) -> None:
+		"""Record that this LLM answered a real request, for this instance and the rest of the process."""
+		self.llm._verified_api_keys = True
+		Agent._verified_llm_connections.add((self.llm.__class__.__name__, self.model_name))
+
+	def _cache_tool_calling_method(self, method: str) -> None:
+		"""Cache a verified method on the LLM instance and in the process-wide store."""
+		setattr(self.llm, '_verified_tool_calling_method', method)
+		_store_tool_calling_method(self.chat_model_library, self.model_name, method)
+
 	def _get_known_tool_calling_method(self) -> str | None:
 		"""Get known tool calling method for common model/library combinations."""
 		# Fast path for known combinations
-		model_lower = self.model_name.lower()
-
-		# OpenAI models
-		if self.chat_model_library == 'ChatOpenAI':
-			if any(m in model_lower for m in ['gpt-4', 'gpt-3.5']):
-				return 'function_calling'
-			if any(m in model_lower for m in ['llama-4', 'llama-3']):
-				return 'function_calling'
-
-		elif self.chat_model_library == 'ChatGroq':
-			if any(m in model_lower for m in ['llama-4', 'llama-3']):
-				return 'function_calling'
-
-		# Azure OpenAI models
-		elif self.chat_model_library == 'AzureChatOpenAI':
-			if 'gpt-4-' in model_lower:
-				return 'tools'
-			else:
-				return 'function_calling'
-
-		# Google models
-		elif self.chat_model_library == 'ChatGoogleGenerativeAI':
-			return None  # Google uses native tool support
-
-		# Anthropic models
-		elif self.chat_model_library in ['ChatAnthropic', 'AnthropicChat']:
-			if any(m in model_lower for m in ['claude-3', 'claude-2']):
-				return 'tools'
+		known_methods = _KNOWN_TOOL_CALLING_METHODS.get(self.chat_model_library)
+		if known_methods is not None:
+			model_lower = self.model_name.lower()
+			for patterns, method in known_methods:
+				if any(pattern in model_lower for pattern in patterns):
+					return method
 
 		# Models known to not support tools
 		elif is_model_without_tool_support(self.model_name):
@@ -474,14 +582,15 @@ class Agent(Generic[Context]):
 				content = getattr(response, 'content', '').strip()
 
 				# Remove surrounding markdown code blocks if present
-				if content.startswith('```json') and content.endswith('```'):
-					content = content[7:-3].strip()
-				elif content.startswith('```') and content.endswith('```'):
-					content = content[3:-3].strip()
+				if content.endswith('```'):
+					for fence in ('```json', '```'):
+						if content.startswith(fence):
+							content = content.removeprefix(fence).removesuffix('```').strip()
+							break
 
 				# Attempt to parse and validate the answer
 				try:
-					result = json.loads(content)
+					result = json_loads(content)
 					answer = str(result.get('answer', '')).strip().lower().strip(' .')
 
 					if expected_answer.lower() not in answer:
@@ -536,12 +645,13 @@ class Agent(Generic[Context]):
 			logger.debug(f"🛠️ Tool calling method '{method}' test failed: {type(e).__name__}: {str(e)}")
 			return False
 
-	async def _test_tool_calling_method_async(self, method: str) -> tuple[str, bool]:
-		"""Test if a specific tool calling method works with the current LLM (async version)."""
-		# Run the synchronous test in a thread pool to avoid blocking
-		loop = asyncio.get_event_loop()
-		result = await loop.run_in_executor(None, self._test_tool_calling_method, method)
-		return (method, result)
+	@staticmethod
+	def _is_empty_action(action: ActionModel) -> bool:
+		"""Whether the model returned an action object without selecting any action.
+
+		Fields set to null (e.g. ``{"done": null}``) do not count as a selected action.
+		"""
+		return action.get_action_name() is None
 
 	async def _raise_if_stopped_or_paused(self) -> None:
 		"""Utility function that raises an InterruptedError if the agent is stopped or paused."""
@@ -556,19 +666,35 @@ class Agent(Generic[Context]):
 		step_start_time = time.time()
 		tokens = 0
 		app_state = None
+		planner_task: asyncio.Task[str | None] | None = None
 
 		try:
-			# Get the current app state as AppState
-			original_app_state = self.app.get_app_state()
+			# Summarise history in a worker thread while the app state is captured.
+			# Memory rewrites the message history, so it is awaited before the next
+			# state message is added rather than left running across the step.
+			memory_future = None
+			if self.enable_memory and self.memory and self.state.n_steps % self.memory.config.memory_interval == 0:
+				memory_future = asyncio.get_running_loop().run_in_executor(
+					None, self.memory.create_procedural_memory, self.state.n_steps
+				)
 
-			# Create AppStateHistory using the class method for history tracking only
-			app_state = AppStateHistory.from_app_state(original_app_state)
+			try:
+				# Get the current app state as AppState
+				original_app_state = self.app.get_app_state()
 
-			if self.enable_memory and self.memory and self.state.n_steps % self.memory.config.memory_interval == 0:
-				self.memory.create_procedural_memory(self.state.n_steps)
+				# Create AppStateHistory using the class method for history tracking only
+				app_state = AppStateHistory.from_app_state(original_app_state)
+			finally:
+				if memory_future is not None:
+					await memory_future
 
 			await self._raise_if_stopped_or_paused()
 
+			# Run planner if conditions are met. It is started right away on the state
+			# captured above so its LLM round-trip overlaps with the rest of the step.
+			if self.settings.planner_llm and self.state.n_steps % self.settings.planner_interval == 0:
+				planner_task = asyncio.create_task(self._run_planner(original_app_state))
+
 			# Use MessageManager to add state message with app state and previous results
 			self._message_manager.add_state_message(
 				app_state=original_app_state,
@@ -578,9 +704,9 @@ class Agent(Generic[Context]):
 				use_vision=self.settings.use_vision,
 			)
 
-			# Run planner if conditions are met
-			if self.settings.planner_llm and self.state.n_steps % self.settings.planner_interval == 0:
-				plan = await self._run_planner()
+			if planner_task is not None and self.settings.is_planner_reasoning:
+				# Reasoning guidance is part of this step's prompt, so wait for it here
+				plan = await planner_task
 				# add plan before last state message
 				self._message_manager.add_plan(plan, position=-1)
 			# If this is the last step, add a message to use 'done' action
@@ -593,9 +719,9 @@ class Agent(Generic[Context]):
 				logger.info('Last step finishing up')
 				self._message_manager._add_message_with_tokens(HumanMessage(content=msg))
 
-				# Force the action model to only include done action
-				self.ActionModel = self.controller.registry.create_action_model(include_actions=['done'])
-				self.AgentOutput = AgentOutput.type_with_custom_actions(self.ActionModel)
+				# Force the action model to only include done action (built once in _setup_action_models)
+				self.ActionModel = self.DoneActionModel
+				self.AgentOutput = self.DoneAgentOutput
 			# Get all messages from message manager
 			input_messages = self._message_manager.get_messages()
 			tokens = self._message_manager.state.history.current_tokens
@@ -606,7 +732,7 @@ class Agent(Generic[Context]):
 				if (
 					not model_output.action
 					or not isinstance(model_output.action, list)
-					or all(action.model_dump() == {} for action in model_output.action)
+					or all(self._is_empty_action(action) for action in model_output.action)
 				):
 					logger.warning('Model returned empty action. Retrying...')
 
@@ -615,7 +741,7 @@ class Agent(Generic[Context]):
 					)
 					retry_messages = input_messages + [clarification_message]
 					model_output = await self.get_next_action(retry_messages)
-					if not model_output.action or all(action.model_dump() == {} for action in model_output.action):
+					if not model_output.action or all(self._is_empty_action(action) for action in model_output.action):
 						logger.warning('Model still returned empty after retry. Inserting safe noop action.')
 						action_instance = self.ActionModel(
 							done={
@@ -656,6 +782,10 @@ class Agent(Generic[Context]):
 				self._message_manager._remove_last_state_message()
 				raise e
 
+			if planner_task is not None and not self.settings.is_planner_reasoning:
+				# Insights are only logged; the planner call overlapped with get_next_action
+				await planner_task
+
 			# Execute the model's action(s)
 			result = await self.multi_act(model_output.action)
 			self.state.last_result = result
@@ -683,6 +813,9 @@ class Agent(Generic[Context]):
 			self.state.last_result = result
 
 		finally:
+			if planner_task is not None and not planner_task.done():
+				planner_task.cancel()
+
 			step_end_time = time.time()
 			if not result:
 				return
@@ -716,13 +849,6 @@ class Agent(Generic[Context]):
 				error_msg += '\n\nReturn a valid JSON object with the required fields.'
 
 		else:
-			from openai import RateLimitError
-
-			RATE_LIMIT_ERRORS = (
-				RateLimitError,  # OpenAI
-				# Add other rate limit errors as needed
-			)
-
 			if isinstance(error, RATE_LIMIT_ERRORS):
 				logger.warning(f'{prefix}{error_msg}')
 				await asyncio.sleep(self.settings.retry_delay)
@@ -743,7 +869,6 @@ class Agent(Generic[Context]):
 		self.state.history.history.append(history_item)
 
 	THINK_TAGS = re.compile(r'<think>.*?</think>', re.DOTALL)
-	STRAY_CLOSE_TAG = re.compile(r'.*?</think>', re.DOTALL)
 
 	def _remove_think_tags(self, text: str) -> str:
 		"""Remove thinking tags from text.
@@ -754,11 +879,17 @@ class Agent(Generic[Context]):
 		Returns:
 		    Processed text with thinking tags removed
 		"""
+		# Both steps below need a closing tag, so most responses skip the regex entirely
+		if '</think>' not in text:
+			return text.strip()
 		# Step 1: Remove well-formed <think>...</think>
-		text = re.sub(self.THINK_TAGS, '', text)
+		text = self.THINK_TAGS.sub('', text)
 		# Step 2: If there's an unmatched closing tag </think>,
-		#         remove everything up to and including that.
-		text = re.sub(self.STRAY_CLOSE_TAG, '', text)
+		#         remove everything up to and including the last one.
+		#         A plain string search is enough – no second regex pass.
+		_, closing_tag, after = text.rpartition('</think>')
+		if closing_tag:
+			text = after
 		return text.strip()
 
 	def _convert_input_messages(self, input_messages: list[BaseMessage]) -> list[BaseMessage]:
@@ -768,17 +899,59 @@ class Agent(Generic[Context]):
 		else:
 			return input_messages
 
+	def _build_cached_messages(self, input_messages: list[BaseMessage]) -> list[BaseMessage]:
+		"""Mark the stable conversation prefix for provider-side prompt caching.
+
+		The system prompt already carries its own cache breakpoint. For providers
+		that support `cache_control` we add one more on the newest history message
+		before the current state message, so everything up to it is read from the
+		cache on the next step and only the fresh app state is prefilled.
+		"""
+		if self.chat_model_library not in CACHE_CONTROL_LLM_LIBRARIES or len(input_messages) < 3:
+			return input_messages
+
+		# The last message is the per-step state; the system message (index 0) is cached already
+		for i in range(len(input_messages) - 2, 0, -1):
+			message = input_messages[i]
+			if isinstance(message, HumanMessage) and isinstance(message.content, str) and message.content:
+				cached = message.model_copy(
+					update={'content': [{'type': 'text', 'text': message.content, 'cache_control': {'type': 'ephemeral'}}]}
+				)
+				# Copy the list – history messages are shared with the message manager and must not change
+				return [*input_messages[:i], cached, *input_messages[i + 1 :]]
+		return input_messages
+
+	@staticmethod
+	def _log_prompt_cache_usage(raw_message: Any) -> None:
+		"""Log how many input tokens were served from the provider prompt cache."""
+		usage = getattr(raw_message, 'usage_metadata', None)
+		if not usage:
+			return
+		cache_read = (usage.get('input_token_details') or {}).get('cache_read')
+		if cache_read is not None:
+			logger.debug('🗄️ Prompt cache: %s of %s input tokens read from cache', cache_read, usage.get('input_tokens'))
+
 	def _log_llm_call_info(self, input_messages: list[BaseMessage], method: str) -> None:
 		"""Log comprehensive information about the LLM call being made"""
-		# Count messages and check for images
-		message_count = len(input_messages)
-		total_chars = sum(len(str(msg.content)) for msg in input_messages)
-		has_images = any(
-			hasattr(msg, 'content')
-			and isinstance(msg.content, list)
-			and any(isinstance(item, dict) and item.get('type') == 'image_url' for item in msg.content)
-			for msg in input_messages
-		)
+		if not logger.isEnabledFor(logging.INFO):
+			return
+
+		print('=' * _terminal_width())
+
+		# Count characters and check for images in a single pass. Image parts are
+		# skipped rather than stringified, so base64 payloads are never copied.
+		total_chars = 0
+		has_images = False
+		for msg in input_messages:
+			content = msg.content
+			if isinstance(content, str):
+				total_chars += len(content)
+				continue
+			for item in content:
+				if isinstance(item, dict) and item.get('type') == 'image_url':
+					has_images = True
+				else:
+					total_chars += len(str(item))
 		current_tokens = getattr(self._message_manager.state.history, 'current_tokens', 0)
 
 		# Count available tools/actions from the current ActionModel
@@ -788,27 +961,63 @@ class Agent(Generic[Context]):
 		# Format the log message parts
 		image_status = ', 📷 img' if has_images else ''
 		if method == 'raw':
-			output_format = '=> raw text'
-			tool_info = ''
+			logger.info(
+				'🧠 LLM call => %s [✉️ %d msg, ~%s tk, %d char%s] => raw text',
+				self.chat_model_library,
+				len(input_messages),
+				current_tokens,
+				total_chars,
+				image_status,
+			)
 		else:
-			output_format = '=> JSON out'
-			tool_info = f' + 🔨 {tool_count} tools ({method})'
+			logger.info(
+				'🧠 LLM call => %s [✉️ %d msg, ~%s tk, %d char%s] => JSON out + 🔨 %d tools (%s)',
+				self.chat_model_library,
+				len(input_messages),
+				current_tokens,
+				total_chars,
+				image_status,
+				tool_count,
+				method,
+			)
 
-		term_width = shutil.get_terminal_size((80, 20)).columns
-		print('=' * term_width)
-		logger.info(
-			f'🧠 LLM call => {self.chat_model_library} [✉️ {message_count} msg, ~{current_tokens} tk, {total_chars} char{image_status}] {output_format}{tool_info}'
-		)
+	def _parse_agent_output(self, content: str) -> AgentOutput:
+		"""Validate model output text into AgentOutput
+
+		Plain JSON is validated directly from the string, without building an intermediate
+		dict. Fenced or prose-wrapped output goes through extract_json_from_model_output.
+		"""
+		try:
+			return self.AgentOutput.model_validate_json(content)
+		except ValidationError:
+			return self.AgentOutput.model_validate(extract_json_from_model_output(content))
+
+	async def _stream_raw_completion(self, input_messages: list[BaseMessage]) -> BaseMessage:
+		"""Stream a raw completion and stop decoding once the JSON answer object has closed"""
+		scanner = JsonObjectScanner(strict_start=True)
+		output = None
+		stream = self.llm.astream(input_messages)
+		try:
+			async for chunk in stream:
+				output = chunk if output is None else output + chunk
+				if isinstance(chunk.content, str) and scanner.feed(chunk.content):
+					# Anything after the object (closing fences, commentary) is discarded anyway
+					break
+		finally:
+			await stream.aclose()
+		if output is None:
+			raise ValueError('Model returned an empty response')
+		return output
 
 	@time_execution_async('--get_next_action')
 	async def get_next_action(self, input_messages: list[BaseMessage]) -> AgentOutput:
 		"""Get next action from LLM based on current state"""
-		input_messages = self._convert_input_messages(input_messages)
+		input_messages = self._build_cached_messages(self._convert_input_messages(input_messages))
 
 		if self.tool_calling_method == 'raw':
 			self._log_llm_call_info(input_messages, self.tool_calling_method)
 			try:
-				output = await self.llm.ainvoke(input_messages)
+				output = await self._stream_raw_completion(input_messages)
 				response = {'raw': output, 'parsed': None}
 			except Exception as e:
 				logger.error(f'Failed to invoke model: {str(e)}')
@@ -819,8 +1028,7 @@ class Agent(Generic[Context]):
 			# TODO: currently invoke does not return reasoning_content, we should override invoke
 			output.content = self._remove_think_tags(str(output.content))
 			try:
-				parsed_json = extract_json_from_model_output(output.content)
-				parsed = self.AgentOutput(**parsed_json)
+				parsed = self._parse_agent_output(output.content)
 				response['parsed'] = parsed
 			except (ValueError, ValidationError) as e:
 				logger.warning(f'Failed to parse model output: {output} {str(e)}')
@@ -845,6 +1053,8 @@ class Agent(Generic[Context]):
 			except Exception as e:
 				response, raw = handle_llm_error(e)
 
+		self._log_prompt_cache_usage(response.get('raw'))
+
 		# Handle tool call responses
 		if response.get('parsing_error') and 'raw' in response:
 			raw_msg = response['raw']
@@ -852,23 +1062,20 @@ class Agent(Generic[Context]):
 			if hasattr(raw_msg, 'tool_calls') and raw_msg.tool_calls:
 				# Convert tool calls to AgentOutput format
 				tool_call = raw_msg.tool_calls[0]  # Take first tool call
-				tool_call_args = tool_call['args']
-				parsed = self.AgentOutput(**tool_call_args)
-
 				try:
-					action = parsed.action[0].model_dump(exclude_unset=True)
-				except Exception as e:
-					raise ValueError(f'Could not parse response. {parsing_error} tried to parse {response["raw"]} to {parsed}')
-
+					parsed = self.AgentOutput.model_validate(tool_call['args'])
+				except ValidationError as e:
+					raise ValueError(f'Could not parse response. {parsing_error} tried to parse {raw_msg}') from e
 			else:
 				parsed = None
 		else:
 			parsed = response['parsed']
 
 		if not parsed:
+			# Fall back to parsing the raw text (a message, or the failed generation string)
+			raw = response['raw']
 			try:
-				parsed_json = extract_json_from_model_output(response['raw'])
-				parsed = self.AgentOutput(**parsed_json)
+				parsed = self._parse_agent_output(str(getattr(raw, 'content', raw)))
 			except Exception as e:
 				logger.warning(f'Failed to parse model output: {response["raw"]} {str(e)}')
 				raise ValueError(f'Could not parse response. {str(e)}')
@@ -893,9 +1100,10 @@ class Agent(Generic[Context]):
 		# Collect action details
 		action_details = []
 		for i, action in enumerate(parsed.action):
-			action_data = action.model_dump(exclude_unset=True)
-			action_name = next(iter(action_data.keys())) if action_data else 'unknown'
-			action_params = action_data.get(action_name, {}) if action_data else {}
+			# Only the selected action's params are dumped, not the whole action model
+			action_name = action.get_action_name() or 'unknown'
+			selected_params = getattr(action, action_name, None)
+			action_params = selected_params.model_dump(exclude_unset=True) if isinstance(selected_params, BaseModel) else {}
 
 			# Format key parameters concisely
 			param_summary = []
@@ -917,14 +1125,15 @@ class Agent(Generic[Context]):
 			param_str = f'({", ".join(param_summary)})' if param_summary else ''
 			action_details.append(f'{action_name}{param_str}')
 
-		# Create summary based on single vs multi-action
+		# Create summary based on single vs multi-action (debug output only)
 		if action_count == 1:
-			logger.info(f'☝️ Decided next action: {action_name}{param_str}')
+			logger.debug('☝️ Decided next action: %s', action_details[0])
 		else:
-			summary_lines = [f'✌️ Decided next {action_count} multi-actions:']
-			for i, detail in enumerate(action_details):
-				summary_lines.append(f'          {i + 1}. {detail}')
-			logger.info('\n'.join(summary_lines))
+			logger.debug(
+				'✌️ Decided next %d multi-actions:\n%s',
+				action_count,
+				'\n'.join(f'          {i}. {detail}' for i, detail in enumerate(action_details, 1)),
+			)
 
 	@property
 	def message_manager(self) -> MessageManager:
@@ -932,8 +1141,13 @@ class Agent(Generic[Context]):
 		return self._message_manager
 
 	async def multi_act(self, actions: list[Any]) -> list[ActionResult]:
-		"""Execute multiple actions"""
+		"""Execute multiple actions
+
+		The settle wait is skipped after read-only actions (registered with
+		``side_effect=False``), since they cannot have changed the app.
+		"""
 		results = []
+		registry = self.controller.registry
 
 		for i, action in enumerate(actions):
 			try:
@@ -947,11 +1161,12 @@ class Agent(Generic[Context]):
 
 				results.append(result)
 
-				logger.debug(f'Executed action {i + 1} / {len(actions)}')
+				logger.debug('Executed action %d / %d', i + 1, len(actions))
 				if results[-1].is_done or results[-1].error or i == len(actions) - 1:
 					break
 
-				await asyncio.sleep(0.5)  # Small delay between actions
+				if not registry.is_read_only(action):
+					await self.controller.wait_until_idle()
 
 			except asyncio.CancelledError:
 				# Gracefully handle task cancellation
@@ -998,6 +1213,7 @@ class Agent(Generic[Context]):
 	) -> AgentHistoryList:
 		"""Execute the task with maximum number of steps"""
 		agent_run_error: str | None = None  # Initialize error tracking variable
+		self._run_loop = asyncio.get_running_loop()
 
 		try:
 			self._log_agent_run()
@@ -1020,11 +1236,15 @@ class Agent(Generic[Context]):
 					agent_run_error = 'Agent stopped programmatically'
 					break
 
-				while self.state.paused:
-					await asyncio.sleep(0.2)  # Small delay to prevent CPU spinning
-					if self.state.stopped:  # Allow stopping while paused
-						agent_run_error = 'Agent stopped programmatically while paused'
-						break
+				while self.state.paused and not self.state.stopped:
+					self._resume_event.clear()
+					try:
+						await asyncio.wait_for(self._resume_event.wait(), 0.2)
+					except asyncio.TimeoutError:
+						pass  # Re-check: the state may have been changed directly rather than via resume()
+				if self.state.stopped:  # Allow stopping while paused
+					agent_run_error = 'Agent stopped programmatically while paused'
+					break
 
 				if on_step_start is not None:
 					await on_step_start(self)
@@ -1088,9 +1308,8 @@ class Agent(Generic[Context]):
 			action_name = next(iter(action_dict))
 			params = action_dict[action_name]
 
-			# Get the parameter model for this action from registry
-			action_info = self.controller.registry.registry.actions[action_name]
-			param_model = action_info.param_model
+			# Get the parameter model for this action
+			param_model = self._action_index[action_name]
 
 			# Create validated parameters using the appropriate param model
 			validated_params = param_model(**params)
@@ -1111,10 +1330,15 @@ class Agent(Generic[Context]):
 		"""
 		logger.debug(f'Verifying the {self.llm.__class__.__name__} LLM knows the capital of France...')
 
-		if getattr(self.llm, '_verified_api_keys', None) is True or SKIP_LLM_API_KEY_VERIFICATION:
+		llm_key = (self.llm.__class__.__name__, self.model_name)
+		if (
+			getattr(self.llm, '_verified_api_keys', None) is True
+			or SKIP_LLM_API_KEY_VERIFICATION
+			or llm_key in Agent._verified_llm_connections
+		):
 			# skip roundtrip connection test for speed in cloud environment
 			# If the LLM API keys have already been verified during a previous run, skip the test
-			self.llm._verified_api_keys = True
+			self._mark_llm_verified()
 			return True
 
 		# Show a warning if it looks like any required environment variables are missing
@@ -1135,7 +1359,7 @@ class Agent(Generic[Context]):
 				logger.debug(
 					f'🪪 LLM API keys {", ".join(required_keys)} work, {self.llm.__class__.__name__} model is connected & responding correctly.'
 				)
-				self.llm._verified_api_keys = True
+				self._mark_llm_verified()
 				return True
 			else:
 				logger.warning(
@@ -1165,7 +1389,7 @@ class Agent(Generic[Context]):
 		Returns:
 		    bool: True if required variables are set according to any_or_all condition
 		"""
-		return any_or_all(var in os.environ and os.environ[var] for var in required_vars)
+		return any_or_all(os.environ.get(var) for var in required_vars)
 
 	def pause(self) -> None:
 		"""Pause the agent before the next step"""
@@ -1177,18 +1401,36 @@ class Agent(Generic[Context]):
 		print('----------------------------------------------------------------------')
 		print('▶️  Got Enter, resuming agent execution where it left off...\n')
 		self.state.paused = False
+		self._wake_paused_run()
 
 	def stop(self) -> None:
 		"""Stop the agent"""
 		logger.info('⏹️ Agent stopping')
 		self.state.stopped = True
+		self._wake_paused_run()
+
+	def _wake_paused_run(self) -> None:
+		"""Wake a paused run(), safely even when called from a thread other than run()'s loop"""
+		loop = self._run_loop
+		if loop is None or loop.is_closed():
+			self._resume_event.set()
+			return
+		try:
+			same_loop = asyncio.get_running_loop() is loop
+		except RuntimeError:
+			same_loop = False
+		if same_loop:
+			self._resume_event.set()
+		else:
+			loop.call_soon_threadsafe(self._resume_event.set)
 
 	async def close(self):
 		"""Close all resources"""
 		try:
-			# Force garbage collection
 			self.app.close()
-			gc.collect()
+			# A full collection pauses the process, so it is opt-in
+			if self.settings.force_gc_on_close:
+				gc.collect()
 		except Exception as e:
 			logger.error(f'Error during cleanup: {e}')
 
@@ -1196,34 +1438,31 @@ class Agent(Generic[Context]):
 	# Planner integration
 	# ------------------------------------------------------------------
 
-	async def _run_planner(self, step_info: AgentStepInfo | None = None) -> None:
-		"""Run the planner if conditions are met"""
+	async def _run_planner(self, app_state: AppState) -> str | None:
+		"""Run the planner if conditions are met
+
+		Args:
+		    app_state: The app state captured for the current step
+
+		Returns:
+		    Planner guidance to add to the conversation (reasoning mode only), else None
+		"""
 		if not self.settings.planner_llm:
-			return
+			return None
 
 		# Only run planner based on interval
 		if self.state.n_steps % self.settings.planner_interval != 0:
-			return
+			return None
 
 		logger.info(f'📋 Running planner (step {self.state.n_steps})')
 
 		try:
-			# Get current app state for planner context
-			app_state = self.app.get_app_state()
-
 			# Create planner messages
 			messages = []
 
-			# Add system message for planner
-			system_prompt = PlannerPrompt(
-				available_actions=self.unfiltered_actions,
-				original_task=self.task,
-				current_step=self.state.n_steps,
-				is_reasoning=self.settings.is_planner_reasoning,
-				extend_prompt=self.settings.extend_planner_system_prompt,
-			).get_system_message()
-
-			messages.append(SystemMessage(content=system_prompt))
+			# Add system message for planner (a HumanMessage in reasoning mode)
+			self._planner_prompt.current_step = self.state.n_steps
+			messages.append(self._planner_prompt.get_system_message())
 
 			# Add current state context
 			app_context = f'Current app state: {len(app_state.selector_map)} elements available'
@@ -1231,15 +1470,15 @@ class Agent(Generic[Context]):
 				app_context += f'\n{app_state.get_text_representation()}'
 
 			# Add recent history context
-			if len(self.state.history.history) > 0:
-				recent_actions = []
-				for i, hist in enumerate(self.state.history.history[-3:]):  # Last 3 actions
-					if hist.model_output:
-						for action in hist.model_output.action:
-							action_dict = action.model_dump(exclude_none=True)
-							action_type = list(action_dict.keys())[0] if action_dict else 'unknown'
-							recent_actions.append(f'Step {len(self.state.history.history) - 2 + i}: {action_type}')
-
+			history = self.state.history.history
+			if history:
+				first_step = len(history) - 2
+				recent_actions = [
+					f'Step {first_step + i}: {action.get_action_name() or "unknown"}'
+					for i, hist in enumerate(history[-3:])  # Last 3 actions
+					if hist.model_output
+					for action in hist.model_output.action
+				]
 				if recent_actions:
 					app_context += f'\nRecent actions: {"; ".join(recent_actions)}'
 
@@ -1264,9 +1503,8 @@ Focus on high-level planning and identifying the most efficient path to complete
 				planner_output = response.content if hasattr(response, 'content') else str(response)
 				logger.info(f'🧠 Planner guidance: {planner_output[:200]}...')
 
-				# Add planner guidance to message manager
-				guidance_message = HumanMessage(content=f'Strategic guidance from planner: {planner_output}')
-				self._message_manager._add_message_with_tokens(guidance_message)
+				# Returned to step(), which inserts it before the state message
+				return f'Strategic guidance from planner: {planner_output}'
 			else:
 				# Simple planner mode - just log insights
 				response = await self.settings.planner_llm.ainvoke(messages)
@@ -1275,3 +1513,4 @@ Focus on high-level planning and identifying the most efficient path to complete
 
 		except Exception as e:
 			logger.warning(f'⚠️ Planner execution failed: {str(e)}')
+		return None
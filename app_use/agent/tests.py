@@ -0,0 +1,103 @@
+import asyncio
+import copy
+import json
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from app_use.agent.message_manager.service import MessageManager, MessageManagerSettings
+from app_use.agent.message_manager.utils import JsonObjectScanner
+from app_use.agent.message_manager.views import MessageManagerState
+from app_use.agent.prompts import SystemPrompt
+from app_use.agent.service import Agent
+from app_use.agent.views import AgentOutput
+from app_use.controller.service import Controller
+
+AGENT_OUTPUT_JSON = json.dumps(
+	{
+		'thinking': 'The task is finished',
+		'evaluation_previous_goal': 'Success',
+		'memory': 'Nothing left to do',
+		'next_goal': 'Report completion',
+		'action': [{'done': {'text': 'finished', 'success': True}}],
+	}
+)
+
+
+def _raw_mode_agent(content: str) -> Agent:
+	"""Build just enough of an Agent to drive the raw-mode completion and parsing path"""
+	agent = Agent.__new__(Agent)
+	agent.llm = GenericFakeChatModel(messages=iter([AIMessage(content=content)]))
+	agent.AgentOutput = AgentOutput.type_with_custom_actions(Controller().registry.create_action_model())
+	return agent
+
+
+def _parse_raw_completion(content: str) -> AgentOutput:
+	"""Mirror get_next_action's raw mode: stream, strip think tags, parse"""
+	agent = _raw_mode_agent(content)
+	output = asyncio.run(agent._stream_raw_completion([]))
+	return agent._parse_agent_output(agent._remove_think_tags(str(output.content)))
+
+
+def test_stray_think_close_tag_with_braces_in_reasoning():
+	parsed = _parse_raw_completion('Okay I need the {done} action.</think>' + AGENT_OUTPUT_JSON)
+	assert parsed.action[0].get_action_name() == 'done'
+
+
+def test_think_block_with_braces_is_skipped():
+	parsed = _parse_raw_completion('<think>maybe {click_element}?</think>\n' + AGENT_OUTPUT_JSON + '\nHope this helps!')
+	assert parsed.action[0].get_action_name() == 'done'
+
+
+def test_prose_with_braces_after_think_block():
+	parsed = _parse_raw_completion('<think>ok</think>\nI will call {done} now.\n```json\n' + AGENT_OUTPUT_JSON + '\n```')
+	assert parsed.action[0].get_action_name() == 'done'
+
+
+def test_strict_scanner_handles_chunked_think_block():
+	text = '<think>' + 'a {b} ' * 1000 + '</think>\n```json\n{"a": {"b": 1}}\n```'
+	scanner = JsonObjectScanner(strict_start=True)
+	completed = [scanner.feed(text[i : i + 4]) for i in range(0, len(text), 4)]
+	assert any(completed)
+	assert json.loads(text[scanner.start : scanner.end]) == {'a': {'b': 1}}
+
+
+def test_strict_scanner_ignores_unrecognised_openings():
+	scanner = JsonObjectScanner(strict_start=True)
+	assert not scanner.feed('Reasoning about {this}')
+	assert not scanner.feed('</think>{"a": 1}')
+
+	scanner = JsonObjectScanner(strict_start=True)
+	assert not scanner.feed('<think>ok</think>\nI will call {done} now.')
+	assert not scanner.feed('{"a": 1}')
+
+
+def test_scanner_reports_object_slice():
+	text = 'Sure: {"a": {"b": "}"}} trailing'
+	scanner = JsonObjectScanner()
+	assert scanner.feed(text)
+	assert json.loads(text[scanner.start : scanner.end]) == {'a': {'b': '}'}}
+
+
+def test_sensitive_data_filtering_leaves_interned_system_message_untouched():
+	for supports_cache_control in (False, True):
+		prompt = SystemPrompt(
+			'',
+			extend_system_message='Log in with hunter2',
+			provider_supports_cache_control=supports_cache_control,
+		)
+		system_message = prompt.get_system_message()
+		original_content = copy.deepcopy(system_message.content)
+
+		# 'username' appears in the static template, 'hunter2' in the extension block
+		for secret in ('hunter2', 'username'):
+			MessageManager(
+				task='Log in',
+				system_message=system_message,
+				settings=MessageManagerSettings(sensitive_data={'password': secret}),
+				state=MessageManagerState(),
+			)
+
+		assert system_message.content == original_content
+		# Later agents still get the same, unfiltered instance
+		assert prompt.get_system_message() is system_message
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import json
 import time
 import traceback
@@ -35,6 +36,9 @@ REQUIRED_LLM_API_ENV_VARS = {
 	'ChatGrok': ['GROK_API_KEY'],
 }
 
+# Chat model classes that accept `cache_control` on content blocks (Anthropic prompt caching)
+CACHE_CONTROL_LLM_LIBRARIES = {'ChatAnthropic', 'AnthropicChat', 'ChatAnthropicVertex'}
+
 
 class AgentSettings(BaseModel):
 	"""Options for the agent"""
@@ -55,6 +59,7 @@ class AgentSettings(BaseModel):
 	is_planner_reasoning: bool = False
 	extend_planner_system_prompt: Optional[str] = None
 	generate_gif: bool = False
+	force_gc_on_close: bool = False
 
 	tool_calling_method: ToolCallingMethod | None = 'auto'
 	page_extraction_llm: Optional[BaseChatModel] = None
@@ -133,10 +138,14 @@ class AgentOutput(BaseModel):
 		)
 
 	@staticmethod
+	@functools.lru_cache(maxsize=16)
 	def type_with_custom_actions(
 		custom_actions: type[ActionModel],
 	) -> type[AgentOutput]:
-		"""Extend actions with custom actions"""
+		"""Extend actions with custom actions
+
+		Cached per action model class, so the same output model is reused.
+		"""
 		model_ = create_model(
 			'AgentOutput',
 			__base__=AgentOutput,
@@ -170,24 +179,23 @@ class AppStateHistory(BaseModel):
 		# Count all element nodes in the tree
 		node_count = len(app_state.selector_map)
 
-		# Get all unique element types
-		tag_names = []
+		# Get all unique element types (dict keeps first-seen order with O(1) membership)
+		tag_names: dict[str, None] = {}
 		interactive_count = 0
 
-		for node_id, node in app_state.selector_map.items():
+		for node in app_state.selector_map.values():
 			# Add element type if it's an ElementNode with a tag_name attribute
-			if hasattr(node, 'tag_name'):
-				tag_name = getattr(node, 'tag_name')
-				if tag_name not in tag_names:
-					tag_names.append(tag_name)
+			tag_name = getattr(node, 'tag_name', None)
+			if tag_name is not None:
+				tag_names[tag_name] = None
 
 				# Count interactive elements
-				if hasattr(node, 'is_interactive') and getattr(node, 'is_interactive'):
+				if getattr(node, 'is_interactive', False):
 					interactive_count += 1
 
 		return cls(
 			node_count=node_count,
-			tag_names=tag_names,
+			tag_names=list(tag_names),
 			interactive_elements=interactive_count,
 			screenshot=app_state.screenshot if screenshot is None else screenshot,
 			selector_map_size=len(app_state.selector_map),
@@ -28,6 +28,9 @@ class Registry(Generic[Context]):
 	def __init__(self, exclude_actions: list[str] = None):
 		self.registry = ActionRegistry()
 		self.exclude_actions = exclude_actions if exclude_actions is not None else []
+		# Action models built by create_action_model, keyed by the included action names.
+		# Cleared whenever a new action is registered.
+		self._action_model_cache: dict[frozenset[str] | None, type[ActionModel]] = {}
 
 	def _get_special_param_types(self) -> dict[str, type | UnionType | None]:
 		"""Get the expected types for special parameters from SpecialActionParameters"""
@@ -234,8 +237,13 @@ class Registry(Generic[Context]):
 		self,
 		description: str,
 		param_model: type[BaseModel] = None,
+		side_effect: bool = True,
 	):
-		"""Decorator for registering actions"""
+		"""Decorator for registering actions
+
+		Set *side_effect* to False for read-only actions that do not change the
+		app, so the agent can skip the settle wait after them.
+		"""
 
 		def decorator(func: Callable):
 			# Skip registration if action is in exclude_actions
@@ -250,8 +258,10 @@ class Registry(Generic[Context]):
 				description=description,
 				function=normalized_func,
 				param_model=actual_param_model,
+				side_effect=side_effect,
 			)
 			self.registry.actions[func.__name__] = action
+			self._action_model_cache.clear()
 
 			# Return the normalized function so it can be called with kwargs
 			return normalized_func
@@ -261,21 +271,28 @@ class Registry(Generic[Context]):
 	async def execute_action(
 		self,
 		action_name: str,
-		params: dict,
+		params: dict | BaseModel,
 		app: App = None,
 		context: Context = None,
 	) -> Any:
-		"""Execute a registered action"""
+		"""Execute a registered action
+
+		*params* may be a raw dict or an already validated instance of the
+		action's param model (as found on a parsed ActionModel).
+		"""
 		if action_name not in self.registry.actions:
 			raise ValueError(f'Action {action_name} not found')
 
 		action = self.registry.actions[action_name]
 		try:
 			# Create the validated Pydantic model
-			try:
-				validated_params = action.param_model(**params)
-			except Exception as e:
-				raise ValueError(f'Invalid parameters {params} for action {action_name}: {type(e)}: {e}') from e
+			if isinstance(params, action.param_model):
+				validated_params = params
+			else:
+				try:
+					validated_params = action.param_model(**params)
+				except Exception as e:
+					raise ValueError(f'Invalid parameters {params} for action {action_name}: {type(e)}: {e}') from e
 
 			# Build special context dict
 			special_context = {
@@ -300,9 +317,20 @@ class Registry(Generic[Context]):
 			raise RuntimeError(f'Error executing action {action_name}: {str(e)}') from e
 
 	def create_action_model(self, include_actions: list[str] = None) -> type[ActionModel]:
-		"""Creates a Pydantic model from registered actions"""
+		"""Creates a Pydantic model from registered actions
+
+		Models are cached per set of included actions, so repeated calls return
+		the same class instead of rebuilding the pydantic schema.
+		"""
+		cache_key = frozenset(include_actions) if include_actions is not None else None
+		cached_model = self._action_model_cache.get(cache_key)
+		if cached_model is not None:
+			return cached_model
+
+		# Fields are added in name order so the generated schema is byte-identical across
+		# runs regardless of registration order, which keeps provider prompt caches warm
 		available_actions = {}
-		for name, action in self.registry.actions.items():
+		for name, action in sorted(self.registry.actions.items()):
 			if include_actions is not None and name not in include_actions:
 				continue
 			available_actions[name] = action
@@ -315,8 +343,21 @@ class Registry(Generic[Context]):
 			for name, action in available_actions.items()
 		}
 
-		return create_model('ActionModel', __base__=ActionModel, **fields)
+		action_model = create_model('ActionModel', __base__=ActionModel, **fields)
+		self._action_model_cache[cache_key] = action_model
+		return action_model
 
 	def get_prompt_description(self) -> str:
 		"""Get a description of all actions for the prompt"""
 		return self.registry.get_prompt_description()
+
+	def is_read_only(self, action: ActionModel) -> bool:
+		"""Whether every action selected in *action* is registered without side effects"""
+		names = [name for name in action.model_fields_set if getattr(action, name, None) is not None]
+		if not names:
+			return False
+		for name in names:
+			registered = self.registry.actions.get(name)
+			if registered is None or registered.side_effect:
+				return False
+		return True
@@ -13,20 +13,25 @@ class ActionModel(BaseModel):
 
 	model_config = ConfigDict(arbitrary_types_allowed=True)
 
+	def get_action_name(self) -> str | None:
+		"""Get the name of the selected action without dumping the model"""
+		for name in self.model_fields_set:
+			if getattr(self, name) is not None:
+				return name
+		return None
+
 	def get_index(self) -> int | None:
 		"""Get the index of the action if it exists"""
-		params = self.model_dump(exclude_unset=True).values()
-		if not params:
+		action_name = self.get_action_name()
+		if action_name is None:
 			return None
-		for param in params:
-			if param is not None and 'index' in param:
-				return param['index']
-		return None
+		return getattr(getattr(self, action_name), 'index', None)
 
 	def set_index(self, index: int):
 		"""Overwrite the index of the action"""
-		action_data = self.model_dump(exclude_unset=True)
-		action_name = next(iter(action_data.keys()))
+		action_name = self.get_action_name()
+		if action_name is None:
+			return
 		action_params = getattr(self, action_name)
 
 		if hasattr(action_params, 'index'):
@@ -40,6 +45,8 @@ class RegisteredAction(BaseModel):
 	description: str
 	function: Callable
 	param_model: type[BaseModel]
+	# False for read-only actions that leave the app untouched (no settle wait needed after them)
+	side_effect: bool = True
 
 	model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -65,7 +72,8 @@ class ActionRegistry(BaseModel):
 
 	def get_prompt_description(self) -> str:
 		"""Get a description of all actions for the prompt"""
-		return '\n'.join(action.prompt_description() for action in self.actions.values())
+		# Sorted by name to match the field order of the generated ActionModel
+		return '\n'.join(self.actions[name].prompt_description() for name in sorted(self.actions))
 
 
 class SpecialActionParameters(BaseModel):
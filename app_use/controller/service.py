@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import (
 	TYPE_CHECKING,
@@ -257,6 +258,7 @@ class Controller(Generic[Context]):
 		@self.registry.action(
 			'Get the current application state with all nodes',
 			param_model=GetAppStateAction,
+			side_effect=False,
 		)
 		async def get_app_state(params: GetAppStateAction, app: App) -> ActionResult:
 			try:
@@ -523,6 +525,20 @@ class Controller(Generic[Context]):
 		"""
 		return self.registry.action(description, **kwargs)
 
+	async def wait_until_idle(self, delay: float = 0.2) -> None:
+		"""
+		Give the app a moment to react after an action that may have changed the UI
+
+		Appium offers no cheap readiness signal to poll (page_source dumps the whole
+		hierarchy), and a snapshot taken right after a tap cannot tell whether a transition
+		has started yet. The UiAutomator2 and XCUITest drivers already wait for the app to
+		go idle before running the next command, so a short fixed delay is enough here.
+
+		Args:
+		    delay: Time to wait in seconds
+		"""
+		await asyncio.sleep(delay)
+
 	@time_execution_sync('--act')
 	async def act(
 		self,
@@ -543,14 +559,15 @@ class Controller(Generic[Context]):
 		"""
 		try:
 			result = None
-			for action_name, params in action.model_dump(exclude_unset=True).items():
-				if params is not None:
-					result = await self.registry.execute_action(
-						action_name,
-						params,
-						app=app,
-						context=context,
-					)
+			# The parsed params are already validated, so pass them on without a dump/re-validate round-trip
+			action_name = action.get_action_name()
+			if action_name is not None:
+				result = await self.registry.execute_action(
+					action_name,
+					getattr(action, action_name),
+					app=app,
+					context=context,
+				)
 
 			if isinstance(result, str):
 				return ActionResult(extracted_content=result, long_term_memory=result[:100])
@@ -1,3 +1,4 @@
+import json
 import logging
 import time
 from collections.abc import Callable, Coroutine
@@ -13,14 +14,23 @@ try:
 except ImportError:
 	OpenAIBadRequestError = None
 
+# Fast JSON parser for model output. orjson's JSONDecodeError subclasses the
+# stdlib one, so callers can keep catching json.JSONDecodeError either way.
+try:
+	import orjson
+
+	json_loads = orjson.loads
+except ImportError:
+	json_loads = json.loads
+
 
 def time_execution_sync(additional_text: str = '') -> Callable[[Callable[P, R]], Callable[P, R]]:
 	def decorator(func: Callable[P, R]) -> Callable[P, R]:
 		@wraps(func)
 		def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-			start_time = time.time()
+			start_time = time.monotonic()
 			result = func(*args, **kwargs)
-			execution_time = time.time() - start_time
+			execution_time = time.monotonic() - start_time
 			# Only log if execution takes more than 0.25 seconds
 			if execution_time > 0.25:
 				logger.debug(f'⏳ {additional_text.strip("-")}() took {execution_time:.2f}s')
@@ -80,9 +90,9 @@ def time_execution_async(
 	def decorator(func: Callable[P, Coroutine[Any, Any, R]]) -> Callable[P, Coroutine[Any, Any, R]]:
 		@wraps(func)
 		async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-			start_time = time.time()
+			start_time = time.monotonic()
 			result = await func(*args, **kwargs)
-			execution_time = time.time() - start_time
+			execution_time = time.monotonic() - start_time
 			# Only log if execution takes more than 0.25 seconds to avoid spamming the logs
 			# you can lower this threshold locally when you're doing dev work to performance optimize stuff
 			if execution_time > 0.25: